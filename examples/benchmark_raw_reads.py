@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import division, print_function
+
+import json
+import timeit
+import tracemalloc
+
+from flask_restx import Namespace, marshal
+from pynamodb.attributes import ListAttribute, MapAttribute, NumberAttribute, UnicodeAttribute, UTCDateTimeAttribute
+from pynamodb.models import Model
+
+from flask_pynamodb_resource import create_resource
+
+
+# Compare the cost per item of marshalling DynamoDB query results via PynamoDB Model instances
+# against marshalling the wire-format items directly. No DynamoDB access is required; both paths
+# start from the same wire-format item that a Query or Scan would return.
+class Location(MapAttribute):
+    lat = NumberAttribute(attr_name='latitude')
+    lng = NumberAttribute(attr_name='longitude')
+    name = UnicodeAttribute()
+
+
+class Person(MapAttribute):
+    fname = UnicodeAttribute(attr_name='firstName')
+    lname = UnicodeAttribute()
+    age = NumberAttribute()
+
+
+class OfficeEmployeeMap(MapAttribute):
+    office_employee_id = NumberAttribute()
+    person = Person()
+    office_location = Location()
+
+
+class Office(Model):
+    class Meta:
+        table_name = 'OfficeModel'
+        region = 'us-west-2'
+
+    office_id = NumberAttribute(hash_key=True)
+    address = Location()
+    employees = ListAttribute(of=OfficeEmployeeMap)
+    opened = UTCDateTimeAttribute(null=True)
+    tags = MapAttribute(null=True)
+
+
+ITEMS = 10000
+
+location = {'M': {'latitude': {'N': '37.77'}, 'longitude': {'N': '-122.41'}, 'name': {'S': 'San Francisco'}}}
+item = {
+    'office_id': {'N': '1'},
+    'address': location,
+    'employees': {'L': [{'M': {'office_employee_id': {'N': str(i)},
+                               'person': {'M': {'firstName': {'S': 'Jane'}, 'lname': {'S': 'Doe'}, 'age': {'N': '35'}}},
+                               'office_location': location}} for i in range(5)]},
+    'opened': {'S': '2020-01-01T09:00:00.000000+0000'},
+    'tags': {'M': {'floor': {'S': '3'}, 'desks': {'N': '40'}}},
+}
+
+resource = create_resource(Office)
+resource._register_routes(Namespace('benchmark'))
+raw_marshaller = resource._get_raw_marshaller()
+
+
+def model_path():
+    return marshal(Office.from_raw_data(item), resource.rest_model)
+
+
+def raw_path():
+    return raw_marshaller(item)
+
+
+def measure(name, func):
+    seconds = min(timeit.repeat(func, number=ITEMS, repeat=3))
+    tracemalloc.start()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<8} {:>10.1f} us/item {:>10d} peak bytes/item'.format(name, seconds / ITEMS * 1e6, peak))
+
+
+if __name__ == '__main__':
+    assert json.dumps(model_path(), sort_keys=True) == json.dumps(raw_path(), sort_keys=True)
+    measure('model', model_path)
+    measure('raw', raw_path)
@@ -1,13 +1,26 @@
 import logging
-from collections import MutableMapping
+import re
+import sys
+from collections import Mapping, MutableMapping, deque
+from functools import partial
 from inspect import isclass
+from threading import Thread
 
 from flask import request
-from flask_restx import Api, Namespace, Resource, fields, marshal
+from flask_restx import Api, Namespace, Resource, fields, inputs, marshal
 from flask_restx.model import ModelBase
+from flask_restx.utils import unpack
 from pynamodb import attributes, indexes
-from pynamodb.exceptions import PutError
-from six import string_types
+from pynamodb.exceptions import PutError, TransactWriteError
+from pynamodb.pagination import ResultIterator
+from pynamodb.transactions import TransactWrite
+from six import reraise, string_types, text_type
+from werkzeug.wrappers import Response
+
+from .cache import ResultCache
+from .connection import configure_connection, get_connection_stats, warm_connection
+from .prefetch import PrefetchIterator
+from .profiling import NULL_PROFILE, HotKeyTracker, Profiler
 
 logger = logging.getLogger(__name__)
 
@@ -155,6 +168,75 @@ class PynamoModel(ModelBase, dict, MutableMapping):
         }
 
 
+class RawItemMarshaller(object):
+    """
+    Marshals DynamoDB wire-format items directly into the output of a PynamoModel,
+    producing the same result as marshal() on a PynamoDB Model instance without
+    instantiating the Model or any of its attribute containers.
+    """
+
+    def __init__(self, rest_model, pynamo_attributes):
+        self._plans = {}
+        self._plan = self._get_plan(rest_model, pynamo_attributes)
+
+    def __call__(self, item):
+        return self._marshal(self._plan, item)
+
+    def _get_plan(self, rest_model, pynamo_attributes):
+        """
+        Pair up each output field with the PynamoDB attribute it is read from. Plans for
+        nested models are built once and reused. A plan is only published once complete,
+        as the marshaller is shared between request threads; if two threads build the same
+        plan, both results are equivalent.
+        """
+        key = id(rest_model)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = []
+            for name, field in rest_model.items():
+                attr = pynamo_attributes.get(name)
+                if attr is not None:
+                    plan.append((name, attr.attr_name, attr, field))
+            self._plans[key] = plan
+        return plan
+
+    def _marshal(self, plan, item):
+        return dict((name, self._output(attr, field, item.get(attr_name))) for name, attr_name, attr, field in plan)
+
+    def _output(self, attr, field, value):
+        if value is not None:
+            value = attr.get_value(value)
+
+        if isinstance(field, PynamoMapAttribute):
+            if value is None:
+                return None
+            value = attr.deserialize(value)
+            return value.attribute_values if isinstance(value, attributes.MapAttribute) else value
+
+        elif isinstance(field, fields.Nested):
+            if value is None:
+                if field.allow_null:
+                    return None
+                elif field.default is not None:
+                    return field.default
+                value = {}
+            return self._marshal(self._get_plan(field.nested, get_attributes(attr)), value)
+
+        elif isinstance(field, fields.List):
+            if value is None:
+                return field.default
+            container = field.container
+            if isinstance(container, fields.Nested):
+                element = attr.element_type()
+                return [self._output(element, container, v) for v in value]
+            return [container.format(v) if v is not None else None for v in attr.deserialize(value)]
+
+        else:
+            if value is None:
+                return field.format(field.default) if field.default else field.default
+            return field.format(attr.deserialize(value))
+
+
 class PynamoResource(Resource):
     """Base class for presenting PynamoDB models and indexes as a REST resource"""
     name = None
@@ -162,25 +244,201 @@ class PynamoResource(Resource):
     pynamo_model = None
     hash_keyname = None
     range_keyname = None
+    connection_settings = None
+    cache = None
+    raw_reads = False
+    raw_marshaller = None
+    prefetch_pages = 1
+    prefetch_max_items = None
+    hydrate = False
+    profiler = None
+    request_profile = NULL_PROFILE
 
     @classmethod
     def _register_routes(cls, ns):
         raise NotImplementedError()
 
+    @classmethod
+    def _table_model(cls):
+        """
+        Return the PynamoDB model for the table that this resource reads from.
+        """
+        if issubclass(cls.pynamo_model, indexes.Index):
+            return cls.pynamo_model.Meta.model
+        return cls.pynamo_model
+
+    @classmethod
+    def _get_raw_marshaller(cls):
+        if cls.raw_marshaller is None:
+            pynamo_attributes = dict(get_attributes(cls._table_model()))
+            pynamo_attributes.update(get_attributes(cls.pynamo_model))
+            cls.raw_marshaller = RawItemMarshaller(cls.rest_model, pynamo_attributes)
+        return cls.raw_marshaller
+
+    def _query(self, hash_key, range_key_condition=None, filter_condition=None, map_fn=None):
+        """
+        Query the model or index, and return a list of marshalled records.
+        If map_fn is passed, it is called on each raw item instead of marshalling it.
+        """
+        if map_fn is None and not self.raw_reads and not self.prefetch_pages and not self.request_profile.enabled:
+            return [marshal(o, self.rest_model) for o in self.pynamo_model.query(hash_key,
+                                                                                 range_key_condition=range_key_condition,
+                                                                                 filter_condition=filter_condition)]
+
+        hash_key = getattr(self.pynamo_model, self.hash_keyname).serialize(hash_key)
+        query_kwargs = {'range_key_condition': range_key_condition,
+                        'filter_condition': filter_condition,
+                        'index_name': self._index_name()}
+        return self._read(self._table_model()._get_connection().query, (hash_key,), query_kwargs, map_fn)
+
+    def _scan(self, filter_condition=None, map_fn=None):
+        """
+        Scan the model or index, and return a list of marshalled records.
+        If map_fn is passed, it is called on each raw item instead of marshalling it.
+        """
+        if map_fn is None and not self.raw_reads and not self.prefetch_pages and not self.request_profile.enabled:
+            return [marshal(o, self.rest_model) for o in self.pynamo_model.scan(filter_condition=filter_condition)]
+
+        scan_kwargs = {'filter_condition': filter_condition,
+                       'index_name': self._index_name()}
+        return self._read(self._table_model()._get_connection().scan, (), scan_kwargs, map_fn)
+
+    def _read(self, operation, args, kwargs, map_fn=None):
+        """
+        Page through the results of a Query or Scan operation, and return a list of marshalled records.
+        If raw reads are enabled, items are marshalled directly from the DynamoDB response.
+        If page prefetch is enabled, the next pages are fetched while the current page is marshalled.
+        """
+        if map_fn is not None:
+            pass
+        elif self.raw_reads:
+            map_fn = self._get_raw_marshaller()
+        else:
+            from_raw_data = self._table_model().from_raw_data
+
+            def map_fn(item):
+                return marshal(from_raw_data(item), self.rest_model)
+
+        if self.request_profile.enabled:
+            operation, map_fn = self._instrument(operation, map_fn)
+            kwargs = dict(kwargs, return_consumed_capacity='TOTAL')
+
+        if not self.prefetch_pages:
+            return list(ResultIterator(operation, args, kwargs, map_fn=map_fn))
+
+        results = PrefetchIterator(operation, args, kwargs, map_fn=map_fn,
+                                   depth=self.prefetch_pages,
+                                   max_items=self.prefetch_max_items)
+        try:
+            return list(results)
+        finally:
+            results.close()
+
+    def _instrument(self, operation, map_fn):
+        """
+        Wrap a DynamoDB operation and marshalling function to record their time and consumed capacity
+        in the request profile. Both may be called from prefetch threads.
+        """
+        profile = self.request_profile
+
+        def timed_operation(*args, **kwargs):
+            with profile.phase('dynamodb'):
+                data = operation(*args, **kwargs)
+            profile.add_capacity(data.get('ConsumedCapacity'))
+            return data
+
+        def timed_map_fn(item):
+            with profile.phase('marshal'):
+                return map_fn(item)
+
+        return timed_operation, timed_map_fn
+
+    def _index_name(self):
+        if issubclass(self.pynamo_model, indexes.Index):
+            return self.pynamo_model.Meta.index_name
+        return None
+
+    def _cached_results(self, route_kwargs, load):
+        """
+        Return a marshalled list of records from the result cache, if enabled.
+        On a miss, load() is called to fetch the records and the result is cached,
+        tagged with the partition it was read from.
+        """
+        if self.cache is None:
+            return load()
+
+        hash_key = route_kwargs.get(self.hash_keyname)
+        partition = partition_key(self.pynamo_model, hash_key) if hash_key is not None else None
+        key = (partition_key(self.pynamo_model, None),
+               tuple(sorted((k, text_type(v)) for k, v in route_kwargs.items())),
+               tuple(sorted(request.args.items(multi=True))))
+
+        results = self.cache.get(key)
+        if results is None:
+            generation = self.cache.generation(partition)
+            results = load()
+            self.cache.set(key, results, partition, generation)
+        return results
+
     def dispatch_request(self, *args, **kwargs):
         """
         Deserialize path-based arguments to correct type before passing up the stack
         """
+        if self.profiler is not None:
+            self.request_profile = self.profiler.start(request)
+            if self.request_profile.enabled:
+                return self._dispatch_profiled_request(*args, **kwargs)
+
         for k, v in kwargs.items():
             kwargs[k] = getattr(self.pynamo_model, k).deserialize(v)
         return super(PynamoResource, self).dispatch_request(*args, **kwargs)
 
+    def _dispatch_profiled_request(self, *args, **kwargs):
+        """
+        Dispatch a request, recording the time spent in each phase and the hash key accessed.
+        Responses to authorized requests are encoded here so that encoding time can be reported.
+        """
+        profile = self.request_profile
+        if profile.profiler is not None:
+            profile.profiler.enable()
+        try:
+            with profile.phase('total'):
+                with profile.phase('deserialize'):
+                    for k, v in kwargs.items():
+                        kwargs[k] = getattr(self.pynamo_model, k).deserialize(v)
+                resp = super(PynamoResource, self).dispatch_request(*args, **kwargs)
+                if profile.report and not isinstance(resp, Response):
+                    with profile.phase('encode'):
+                        data, code, headers = unpack(resp)
+                        resp = self.api.make_response(data, code, headers=headers)
+        finally:
+            if profile.profiler is not None:
+                profile.profiler.disable()
+
+        if profile.sampled and self.hash_keyname in kwargs:
+            table_name, index_name, hash_key = partition_key(self.pynamo_model, kwargs[self.hash_keyname])
+            self.profiler.hot_keys.record(table_name, index_name, hash_key, profile.capacity)
+
+        if profile.report:
+            resp.headers['Server-Timing'] = profile.server_timing()
+            dump = self.profiler.finish(profile, request.endpoint)
+            if dump:
+                resp.headers['X-Pynamo-Profile-Dump'] = dump
+        return resp
+
 
 class IndexResource(PynamoResource):
     """Presents a PynamoDB index as a REST resource"""
+    BATCH_GET_SIZE = 100
+
+    model_resource = None
+    hydrate_concurrency = 4
 
     @classmethod
     def _register_routes(cls, ns):
+        if cls.hydrate and cls.model_resource is None:
+            raise ValueError('Index {} cannot be hydrated without a model resource'.format(cls.name))
+
         cls.rest_model = PynamoModel(name=cls.__name__,
                                      base=cls.pynamo_model,
                                      namespace=ns)
@@ -191,17 +449,32 @@ class IndexResource(PynamoResource):
                       'required': True,
                       'type': cls.rest_model[cls.hash_keyname].__schema_type__}
 
-        get_multi_doc = {'responses': {200: ('Success', [cls.rest_model]),
+        params = {}
+        response_model = cls.rest_model
+        if cls._can_hydrate():
+            params['hydrate'] = {'name': 'hydrate',
+                                 'in': 'query',
+                                 'required': False,
+                                 'type': 'boolean',
+                                 'description': 'Return the full records from the parent model ({}), '
+                                                'instead of the attributes projected into the index ({})'.format(
+                                                    cls.model_resource.rest_model.name, cls.rest_model.name)}
+            if cls.hydrate:
+                response_model = cls.model_resource.rest_model
+
+        get_multi_doc = {'responses': {200: ('Success', [response_model]),
+                                       400: 'Invalid parameters',
                                        500: 'Failed to get records'},
                          'description': 'Returns a list of records'}
 
         ns.add_resource(cls, '/{0}/'.format(cls.name),
                         route_doc={'description': '',
+                                   'params': dict(params),
                                    'get': get_multi_doc,
                                    })
         ns.add_resource(cls, '/{0}/<{1}>'.format(cls.name, cls.hash_keyname),
                         route_doc={'description': '',
-                                   'params': {cls.hash_keyname: hash_param},
+                                   'params': dict(params, **{cls.hash_keyname: hash_param}),
                                    'get': get_multi_doc
                                    })
         if cls.range_keyname:
@@ -212,25 +485,50 @@ class IndexResource(PynamoResource):
 
             ns.add_resource(cls, '/{0}/<{1}>/<{2}>'.format(cls.name, cls.hash_keyname, cls.range_keyname),
                             route_doc={'description': '',
-                                       'params': {cls.hash_keyname: hash_param, cls.range_keyname: range_param},
+                                       'params': dict(params, **{cls.hash_keyname: hash_param, cls.range_keyname: range_param}),
                                        'get': get_multi_doc,
                                        })
 
+    @classmethod
+    def _can_hydrate(cls):
+        """
+        Indexes can only be hydrated once registered with their parent model's resource.
+        Indexes that project all attributes never need hydrating.
+        """
+        return cls.model_resource is not None and not isinstance(cls.pynamo_model.Meta.projection, indexes.AllProjection)
+
     def get(self, *args, **kwargs):
         """
         Get a list of records from a secondary index.
-        Attribute availability may differ from the parent model, depending on the index's projection.
+        Attribute availability may differ from the parent model, depending on the index's projection,
+        unless the records are hydrated from the parent model.
         """
+        route_kwargs = dict(kwargs)
+        try:
+            hydrate = self._get_hydrate()
+        except ValueError as e:
+            return ({'message': 'Invalid hydrate parameter: {}'.format(e)}, 400)
+
+        if hydrate:
+            map_fn = self._get_table_key
+        else:
+            map_fn = None
+
         try:
             if self.hash_keyname in kwargs:
                 hash_key = self._get_hash(kwargs)
                 if self.range_keyname and self.range_keyname in kwargs:
                     range_key = self._get_range(kwargs)
-                    return [marshal(o, self.rest_model) for o in self.pynamo_model.query(hash_key, range_key)]
+                    results = partial(self._query, hash_key, range_key, map_fn=map_fn)
                 else:
-                    return [marshal(o, self.rest_model) for o in self.pynamo_model.query(hash_key)]
+                    results = partial(self._query, hash_key, map_fn=map_fn)
             else:
-                return [marshal(o, self.rest_model) for o in self.pynamo_model.scan()]
+                results = partial(self._scan, map_fn=map_fn)
+
+            if hydrate:
+                return self._cached_results(route_kwargs, lambda: self._hydrate(results()))
+            else:
+                return self._cached_results(route_kwargs, results)
         except Exception as e:
             logger.exception('Failed to get record')
             return ({'message': str(e)}, 500)
@@ -252,13 +550,114 @@ class IndexResource(PynamoResource):
         attr = getattr(self.pynamo_model, self.range_keyname)
         return (attr == value)
 
+    def _get_hydrate(self):
+        """
+        Determine whether index results should be replaced by the full records from the parent model.
+        """
+        if not self._can_hydrate():
+            return False
+        if 'hydrate' in request.args:
+            return inputs.boolean(request.args['hydrate'])
+        return self.hydrate
+
+    def _get_table_key(self, item):
+        """
+        Extract the parent table's primary key from a raw index item.
+        DynamoDB always projects the table's keys into its secondary indexes.
+        """
+        table_model = self._table_model()
+        key = []
+        for name in self._table_keynames():
+            attr = getattr(table_model, name)
+            key.append(attr.deserialize(attr.get_value(item[attr.attr_name])))
+        return tuple(key)
+
+    def _table_keynames(self):
+        if self.model_resource.range_keyname:
+            return (self.model_resource.hash_keyname, self.model_resource.range_keyname)
+        return (self.model_resource.hash_keyname,)
+
+    def _hydrate(self, keys):
+        """
+        Fetch the full records for a list of parent table keys with BatchGetItem, and return them
+        marshalled with the parent model's schema, in the same order as the keys. Requests are
+        split into chunks which are fetched in parallel.
+        BatchGetItem is called through the table connection rather than Model.batch_get(),
+        so that the consumed capacity can be recorded in the request profile.
+        """
+        table_model = self._table_model()
+        table_name = table_model.Meta.table_name
+        connection = table_model._get_connection()
+        keynames = self._table_keynames()
+        key_attrs = [getattr(table_model, n) for n in keynames]
+        rest_model = self.model_resource.rest_model
+        profile = self.request_profile
+        return_consumed_capacity = 'TOTAL' if profile.enabled else None
+        records = {}
+        errors = []
+
+        chunks = deque(keys[i:i + self.BATCH_GET_SIZE] for i in range(0, len(keys), self.BATCH_GET_SIZE))
+
+        def fetch():
+            while True:
+                try:
+                    chunk = chunks.popleft()
+                except IndexError:
+                    return
+                try:
+                    batch = [dict((attr.attr_name, attr.serialize(value)) for attr, value in zip(key_attrs, key)) for key in chunk]
+                    while batch:
+                        data = connection.batch_get_item(batch, return_consumed_capacity=return_consumed_capacity)
+                        profile.add_capacity(data.get('ConsumedCapacity'))
+                        for item in data.get('Responses', {}).get(table_name, []):
+                            obj = table_model.from_raw_data(item)
+                            records[tuple(getattr(obj, n) for n in keynames)] = marshal(obj, rest_model)
+                        batch = data.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys')
+                except Exception:
+                    errors.append(sys.exc_info())
+                    return
+
+        # Time the fan-out as a whole; the per-thread times would add up to more than the elapsed time
+        with profile.phase('hydrate'):
+            threads = [Thread(target=fetch) for _ in range(min(self.hydrate_concurrency, len(chunks)) - 1)]
+            for thread in threads:
+                thread.start()
+            fetch()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            reraise(*errors[0])
+
+        # Records deleted since the index was read are omitted
+        return [records[key] for key in keys if key in records]
+
 
 class ModelResource(PynamoResource):
     """
     Presents a PynamoDB model as a Flask-RESTX resource.
     """
     @classmethod
-    def register(cls, app, url_prefix=None):
+    def register(cls, app, url_prefix=None, connection_settings=None, warm_connections=0, cache=None, transact=False):
+        """
+        Register routes for this model and its indexes with an App, Blueprint, or Api.
+
+        connection_settings may be used to configure the pool size, timeouts, and retries
+        for the model's table connection. If warm_connections is set, the table is
+        validated and that many pooled connections are opened at registration.
+        If a ResultCache is passed, query and scan results for the model and its indexes
+        are cached, and invalidated by writes through this resource.
+        If transact is set, the model is made available to the Api's POST /_transact endpoint,
+        subject to this resource's method_decorators.
+        """
+        if cache is not None:
+            cls.cache = cache
+
+        # Connections are tracked even with the default settings, so that their pool usage is reported
+        configure_connection(cls.pynamo_model, connection_settings or cls.connection_settings)
+        if warm_connections:
+            warm_connection(cls.pynamo_model, warm_connections)
+
         if not url_prefix:
             url_prefix = '/{0}'.format(cls.pynamo_model.Meta.table_name)
 
@@ -273,18 +672,26 @@ class ModelResource(PynamoResource):
             api = Api(app, doc='/doc')
             app.__api__ = api
 
+        if transact:
+            TransactResource.register(api, cls)
+        if cls.profiler is not None:
+            StatsResource.register(api, cls.profiler)
+
         ns = Namespace(cls.pynamo_model.__name__,
                        'PynamoDB model {}.{}'.format(cls.pynamo_model.__module__, cls.pynamo_model.__name__),
                        url_prefix)
         cls._register_routes(ns)
 
-        for item in dir(cls.pynamo_model):
-            item_cls = getattr(getattr(cls.pynamo_model, item), "__class__", None)
-            if item_cls is None:
-                continue
-            if issubclass(item_cls, indexes.Index):
-                index_cls = create_resource(item_cls, item)
-                index_cls._register_routes(ns)
+        for item, item_cls in get_indexes(cls.pynamo_model).items():
+            index_cls = create_resource(item_cls, item,
+                                        cache=cls.cache,
+                                        raw_reads=cls.raw_reads,
+                                        prefetch_pages=cls.prefetch_pages,
+                                        prefetch_max_items=cls.prefetch_max_items,
+                                        hydrate=cls.hydrate,
+                                        profiler=cls.profiler)
+            index_cls.model_resource = cls
+            index_cls._register_routes(ns)
 
         api.add_namespace(ns)
 
@@ -368,25 +775,71 @@ class ModelResource(PynamoResource):
             if condition is not None:
                 filters = filters & condition if filters is not None else condition
 
+        route_kwargs = dict(kwargs)
         try:
             if self.hash_keyname in kwargs:
                 hash_key = self._get_hash(kwargs)
                 if self.range_keyname:
                     if self.range_keyname in kwargs:
                         range_key = self._get_range(kwargs)
-                        return marshal(self.pynamo_model.get(hash_key, range_key), self.rest_model)
+                        return self._get_item(hash_key, range_key)
                     else:
-                        return [marshal(o, self.rest_model) for o in self.pynamo_model.query(hash_key, filter_condition=filters)]
+                        return self._cached_results(route_kwargs, lambda: self._query(hash_key, filter_condition=filters))
                 else:
-                    return marshal(self.pynamo_model.get(hash_key), self.rest_model)
+                    return self._get_item(hash_key)
             else:
-                return [marshal(o, self.rest_model) for o in self.pynamo_model.scan(filter_condition=filters)]
+                return self._cached_results(route_kwargs, lambda: self._scan(filter_condition=filters))
         except self.pynamo_model.DoesNotExist:
             return ({'message': 'Record not found'}, 404)
         except Exception as e:
             logger.exception('Failed to get record')
             return ({'message': str(e)}, 500)
 
+    def _get_item(self, hash_key, range_key=None):
+        """
+        Get a single marshalled record.
+        If raw reads are enabled, the item is marshalled directly from the DynamoDB response.
+        """
+        item = self._get_raw_item(hash_key, range_key)
+        with self.request_profile.phase('marshal'):
+            if self.raw_reads:
+                return self._get_raw_marshaller()(item)
+            return marshal(self.pynamo_model.from_raw_data(item), self.rest_model)
+
+    def _get_object(self, hash_key, range_key=None, attributes_to_get=None):
+        """
+        Get a single record as a PynamoDB model instance.
+        """
+        return self.pynamo_model.from_raw_data(self._get_raw_item(hash_key, range_key, attributes_to_get))
+
+    def _get_raw_item(self, hash_key, range_key=None, attributes_to_get=None):
+        """
+        Get a single item from DynamoDB, in wire format.
+        This is used instead of Model.get() so that the consumed capacity can be recorded in the request profile.
+        """
+        profile = self.request_profile
+        hash_key = getattr(self.pynamo_model, self.hash_keyname).serialize(hash_key)
+        if range_key is not None:
+            range_key = getattr(self.pynamo_model, self.range_keyname).serialize(range_key)
+        with profile.phase('dynamodb'):
+            data = self.pynamo_model._get_connection().get_item(hash_key, range_key=range_key, attributes_to_get=attributes_to_get)
+        profile.add_capacity(data.get('ConsumedCapacity'))
+        if not data.get('Item'):
+            raise self.pynamo_model.DoesNotExist()
+        return data['Item']
+
+    def _write(self, operation):
+        """
+        Call a PynamoDB write operation such as Model.save() or Model.delete(),
+        and record its time and consumed capacity in the request profile.
+        """
+        profile = self.request_profile
+        with profile.phase('dynamodb'):
+            data = operation()
+        if data:
+            profile.add_capacity(data.get('ConsumedCapacity'))
+        return data
+
     def delete(self, *args, **kwargs):
         """
         Delete a record.
@@ -397,10 +850,14 @@ class ModelResource(PynamoResource):
                 if self.range_keyname:
                     if self.range_keyname in kwargs:
                         range_key = self._get_range(kwargs)
-                        self.pynamo_model.get(hash_key, range_key).delete()
+                        old_obj = self._get_object(hash_key, range_key)
+                        self._write(old_obj.delete)
+                        self._invalidate(old_obj)
                         return ('', 204)
                 else:
-                    self.pynamo_model.get(hash_key).delete()
+                    old_obj = self._get_object(hash_key)
+                    self._write(old_obj.delete)
+                    self._invalidate(old_obj)
                     return ('', 204)
         except self.pynamo_model.DoesNotExist:
             pass
@@ -443,7 +900,10 @@ class ModelResource(PynamoResource):
             try:
                 keys = [data[self.hash_keyname], data[self.range_keyname]] if self.range_keyname else [data[self.hash_keyname]]
                 attrs = [self.hash_keyname, self.range_keyname] if self.range_keyname else [self.hash_keyname]
-                old_obj = self.pynamo_model.get(*keys, attributes_to_get=attrs)
+                # Invalidating cached index queries requires the old values of the index keys
+                if self.cache is not None:
+                    attrs = None
+                old_obj = self._get_object(*keys, attributes_to_get=attrs)
             except self.pynamo_model.DoesNotExist:
                 old_obj = None
 
@@ -452,13 +912,15 @@ class ModelResource(PynamoResource):
                     return ({'message': 'Record already exists'}, 409)
                 else:
                     new_obj = self.pynamo_model(**data)
-                    new_obj.save()
+                    self._write(new_obj.save)
+                    self._invalidate(new_obj)
                     location = '{}/{}'.format(data[self.hash_keyname], data[self.range_keyname]) if self.range_keyname else data[self.hash_keyname]
                     return marshal(new_obj, self.rest_model), 201, {'Location': location}
             else:
                 if old_obj:
                     new_obj = self.pynamo_model(**data)
-                    new_obj.save()
+                    self._write(new_obj.save)
+                    self._invalidate(old_obj, new_obj)
                     return marshal(new_obj, self.rest_model)
                 else:
                     return ({'message': 'Record not found'}, 404)
@@ -469,6 +931,33 @@ class ModelResource(PynamoResource):
             logger.exception('Failed to store record')
             return ({'message': str(e)}, 500)
 
+    def _invalidate(self, *objs):
+        """
+        Invalidate cached results for the table and index partitions that contain the given records.
+        """
+        if self.cache is None:
+            return
+
+        partitions = set()
+        for obj in objs:
+            partitions.add(partition_key(self.pynamo_model, getattr(obj, self.hash_keyname)))
+            for index in get_indexes(self.pynamo_model).values():
+                for name, attr in get_attributes(index).items():
+                    value = getattr(obj, name, None)
+                    if attr.is_hash_key and value is not None:
+                        partitions.add(partition_key(index, value))
+        self.cache.invalidate(partitions)
+
+    def _invalidate_indexes(self):
+        """
+        Invalidate cached results for all index partitions, for writes where the old index key values are unknown.
+        """
+        if self.cache is None:
+            return
+
+        for index in get_indexes(self.pynamo_model).values():
+            self.cache.invalidate_prefix(partition_key(index, None)[:2])
+
     def _deserialize_dict(self, data, model):
         logger.info('Deserializing {} as {}'.format(data, model))
         for k, v in data.items():
@@ -514,9 +1003,311 @@ class ModelResource(PynamoResource):
         return data
 
 
-def create_resource(model_or_index, name=None):
+class TransactResource(Resource):
+    """
+    Presents a DynamoDB TransactWriteItems endpoint for the models registered with an Api.
+    """
+    ACTIONS = ('put', 'update', 'delete', 'condition_check')
+
+    # HTTP methods whose method_decorators must allow each action on the target resource
+    ACTION_METHODS = {
+        'put': ('post', 'put'),
+        'update': ('put',),
+        'delete': ('delete',),
+        'condition_check': ('get',),
+    }
+
+    # Error codes for failures that are not caused by the request itself
+    SERVER_ERRORS = ('InternalServerError',
+                     'ProvisionedThroughputExceededException',
+                     'RequestLimitExceeded',
+                     'ThrottlingException',
+                     'TransactionInProgressException')
+
+    resources = None
+
+    @classmethod
+    def register(cls, api, resource):
+        """
+        Make a ModelResource available to the transaction endpoint for an Api,
+        adding the endpoint to the Api if this is the first resource registered.
+        """
+        if not hasattr(api, '__transact__'):
+            api.__transact__ = type('TransactResource', (cls,), {'resources': {}})
+            ns = Namespace('_transact', 'Transactional writes across registered PynamoDB models', '/')
+            transact_doc = {'responses': {200: 'Success',
+                                          400: 'Invalid operation',
+                                          409: 'Transaction cancelled',
+                                          500: 'Failed to write transaction'},
+                            'description': 'Executes a list of put, update, delete, and condition_check operations '
+                                           'across registered tables as a single DynamoDB transaction. Each operation '
+                                           'specifies an "action" and a "table", and either an "item" (put) or a "key" '
+                                           '(update, delete, condition_check). Updates specify "attributes" to set; '
+                                           'a null value removes the attribute. Any operation may specify a "condition" '
+                                           'mapping attribute names to expected values; null requires the attribute to '
+                                           'not exist.'}
+            ns.add_resource(api.__transact__, '/_transact',
+                            methods=['post'],
+                            route_doc={'description': '',
+                                       'post': transact_doc,
+                                       })
+            api.add_namespace(ns)
+        api.__transact__.resources[resource.pynamo_model.Meta.table_name] = resource
+
+    def post(self):
+        """
+        Execute a list of write operations as a single transaction.
+        """
+        data = request.get_json()
+        operations = data.get('operations') if isinstance(data, dict) else data
+        if not isinstance(operations, list) or not operations:
+            return ({'message': 'Request must contain a list of operations'}, 400)
+
+        ops = []
+        errors = []
+        for index, operation in enumerate(operations):
+            try:
+                ops.append(self._prepare(operation))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                errors.append({'index': index, 'message': str(e)})
+        if errors:
+            return ({'message': 'Invalid operation', 'errors': errors}, 400)
+
+        for action, resource, obj, actions, condition in ops:
+            for method in self.ACTION_METHODS[action]:
+                denied = self._authorize(resource, method)
+                if denied is not None:
+                    return denied
+
+        try:
+            connection = ops[0][1].pynamo_model._get_connection().connection
+            with TransactWrite(connection=connection) as transaction:
+                for action, resource, obj, actions, condition in ops:
+                    if action == 'put':
+                        transaction.save(obj, condition=condition)
+                    elif action == 'update':
+                        transaction.update(obj, actions, condition=condition)
+                    elif action == 'delete':
+                        transaction.delete(obj, condition=condition)
+                    else:
+                        keys = [getattr(obj, resource.hash_keyname)]
+                        if resource.range_keyname:
+                            keys.append(getattr(obj, resource.range_keyname))
+                        transaction.condition_check(resource.pynamo_model, *keys, condition=condition)
+        except TransactWriteError as e:
+            if e.cause_response_code == 'TransactionCanceledException':
+                logger.info('Transaction cancelled: {}'.format(e.cause_response_message))
+                return ({'message': 'Transaction cancelled', 'errors': self._cancellation_errors(e, ops)}, 409)
+            logger.exception('Failed to write transaction')
+            if e.cause_response_code and e.cause_response_code not in self.SERVER_ERRORS:
+                return ({'message': e.cause_response_message or str(e)}, 400)
+            return ({'message': str(e.cause or e)}, 500)
+        except Exception as e:
+            logger.exception('Failed to write transaction')
+            return ({'message': str(e)}, 500)
+
+        results = []
+        for index, (action, resource, obj, actions, condition) in enumerate(ops):
+            if action != 'condition_check':
+                # The old values of the index keys are unknown, including for puts that overwrite an item
+                resource()._invalidate(obj)
+                resource()._invalidate_indexes()
+            result = {'index': index, 'action': action, 'table': resource.pynamo_model.Meta.table_name}
+            if action == 'put':
+                result['item'] = marshal(obj, resource.rest_model)
+            results.append(result)
+        return {'operations': results}
+
+    def _prepare(self, operation):
+        """
+        Validate an operation against the target resource's model and build the PynamoDB objects for it.
+        """
+        if not isinstance(operation, dict):
+            raise TypeError('Invalid operation type: {}'.format(operation.__class__.__name__))
+
+        action = operation.get('action')
+        if action not in self.ACTIONS:
+            raise ValueError('Invalid action: {}'.format(action))
+
+        table = operation.get('table')
+        if not isinstance(table, string_types) or table not in self.resources:
+            raise ValueError('Unknown table: {}'.format(table))
+        resource = self.resources[table]
+        instance = resource()
+
+        key_names = [resource.hash_keyname, resource.range_keyname] if resource.range_keyname else [resource.hash_keyname]
+        if action == 'put':
+            data = dict(operation.get('item') or {})
+        else:
+            data = dict(operation.get('key') or {})
+            if set(data.keys()) - set(key_names):
+                raise AttributeError('Key may only contain {}'.format(', '.join(key_names)))
+        for name in key_names:
+            if data.get(name) is None:
+                raise ValueError('Missing key attribute: {}'.format(name))
+            # Records with slashes in their keys could not be addressed by the REST routes
+            if isinstance(data[name], string_types) and '/' in data[name]:
+                raise ValueError('\'{}\' may not contain forward slashes'.format(name))
+        instance._deserialize_dict(data, resource.rest_model)
+
+        actions = None
+        if action == 'update':
+            values = dict(operation.get('attributes') or {})
+            if not values:
+                raise ValueError('Update must set at least one attribute')
+            if set(values.keys()) & set(key_names):
+                raise AttributeError('Cannot change hash or range keys with update')
+            instance._deserialize_dict(values, resource.rest_model)
+            actions = []
+            for name, value in values.items():
+                attr = getattr(resource.pynamo_model, name)
+                actions.append(attr.remove() if value is None else attr.set(value))
+            # Include the new values so that the cache invalidates the index partitions they belong to
+            data.update((k, v) for k, v in values.items() if v is not None)
+
+        condition = self._get_condition(resource, operation.get('condition'))
+        if action == 'condition_check' and condition is None:
+            raise ValueError('condition_check requires a condition')
+
+        if action == 'update':
+            # UpdateItem creates missing items; require the record to exist, as PUT does
+            exists = getattr(resource.pynamo_model, resource.hash_keyname).exists()
+            condition = condition & exists if condition is not None else exists
+
+        return (action, resource, resource.pynamo_model(**data), actions, condition)
+
+    def _authorize(self, resource, method):
+        """
+        Apply the target resource's method_decorators for an HTTP method to a no-op view.
+        Returns None if the decorators allow the request through, or the response they
+        returned instead. Decorators that abort the request will raise as usual.
+        """
+        decorators = resource.method_decorators
+        if isinstance(decorators, Mapping):
+            decorators = decorators.get(method, [])
+
+        allowed = object()
+
+        def view():
+            return allowed
+
+        for decorator in decorators:
+            view = decorator(view)
+        result = view()
+        return None if result is allowed else result
+
+    def _get_condition(self, resource, spec):
+        if not spec:
+            return None
+
+        condition = None
+        for name, value in spec.items():
+            if name not in resource.rest_model:
+                raise AttributeError('Invalid key: {}'.format(name))
+            attr = getattr(resource.pynamo_model, name)
+            if value is None:
+                term = attr.does_not_exist()
+            else:
+                values = {name: value}
+                resource()._deserialize_dict(values, resource.rest_model)
+                term = (attr == values[name])
+            condition = condition & term if condition is not None else term
+        return condition
+
+    def _cancellation_errors(self, error, ops):
+        """
+        Map DynamoDB cancellation reasons back to the submitted operations.
+        PynamoDB submits condition checks, deletes, puts, and updates in that order,
+        regardless of the order in which they were added to the transaction.
+        """
+        order = {'condition_check': 0, 'delete': 1, 'put': 2, 'update': 3}
+        submitted = sorted(range(len(ops)), key=lambda i: (order[ops[i][0]], i))
+
+        reasons = getattr(error.cause, 'response', {}).get('CancellationReasons')
+        if reasons is None:
+            # Older botocore releases only include the reason codes in the error message
+            match = re.search(r'\[(.*)\]', error.cause_response_message or '')
+            codes = [c.strip() for c in match.group(1).split(',')] if match else []
+            reasons = [{'Code': c} for c in codes]
+
+        errors = []
+        for position, reason in enumerate(reasons):
+            code = reason.get('Code')
+            if position < len(submitted) and code and code != 'None':
+                errors.append({'index': submitted[position],
+                               'code': code,
+                               'message': reason.get('Message', code)})
+        return errors
+
+
+class StatsResource(Resource):
+    """
+    Presents hot key and connection pool statistics for the models registered with an Api.
+    """
+    profilers = None
+
+    @classmethod
+    def register(cls, api, profiler):
+        """
+        Make a Profiler's statistics available from the stats endpoint for an Api,
+        adding the endpoint to the Api if this is the first profiler registered.
+        """
+        if not hasattr(api, '__stats__'):
+            api.__stats__ = type('StatsResource', (cls,), {'profilers': []})
+            ns = Namespace('_stats', 'Profiling statistics for registered PynamoDB models', '/')
+            stats_doc = {'responses': {200: 'Success',
+                                       403: 'Not authorized'},
+                         'description': 'Returns the most frequently accessed hash keys for each table and index, '
+                                        'with estimated request and consumed capacity counts, and connection pool '
+                                        'usage for each table. Requires the {} header.'.format(Profiler.HEADER)}
+            ns.add_resource(api.__stats__, '/_stats',
+                            methods=['get'],
+                            route_doc={'description': '',
+                                       'params': {'limit': {'name': 'limit',
+                                                            'in': 'query',
+                                                            'required': False,
+                                                            'type': 'integer',
+                                                            'description': 'Maximum number of keys to return per table or index'}},
+                                       'get': stats_doc,
+                                       })
+            api.add_namespace(ns)
+        if profiler not in api.__stats__.profilers:
+            api.__stats__.profilers.append(profiler)
+
+    def get(self):
+        """
+        Get hot key and connection pool statistics.
+        """
+        if not any(p.is_authorized(request) for p in self.profilers):
+            return ({'message': 'Not authorized'}, 403)
+
+        try:
+            limit = inputs.positive(request.args['limit']) if 'limit' in request.args else None
+        except ValueError as e:
+            return ({'message': 'Invalid limit parameter: {}'.format(e)}, 400)
+
+        hot_keys = {}
+        for profiler in self.profilers:
+            if profiler.hot_keys is not None:
+                for table_name, scopes in profiler.hot_keys.top(limit, profiler.sample_rate).items():
+                    hot_keys.setdefault(table_name, {}).update(scopes)
+        connections = [dict(stats, table=table_name, region=region, host=host)
+                       for (table_name, region, host), stats in get_connection_stats().items()]
+        return {'hot_keys': hot_keys, 'connections': connections}
+
+
+def create_resource(model_or_index, name=None, connection_settings=None, cache=None, raw_reads=False,
+                    prefetch_pages=1, prefetch_max_items=None, hydrate=False, profiler=None):
     """
     Create a resource class for a given PynamoDB model or index.
+    Connection settings are applied to the model's table connection when the resource is registered.
+    If a ResultCache is passed, query and scan results are cached.
+    If raw_reads is set, GET requests marshal items directly from DynamoDB responses instead of PynamoDB models.
+    Up to prefetch_pages pages (and prefetch_max_items items) of query and scan results are fetched in the background
+    while the current page is marshalled; set prefetch_pages to 0 to disable this.
+    If hydrate is set, index query results are replaced by the full records from the parent model
+    unless the index projects all attributes.
+    If a Profiler is passed, requests may be profiled and hot keys tracked.
     """
     logger.debug('Creating resource for {}'.format(model_or_index))
     if issubclass(model_or_index, indexes.Index):
@@ -526,7 +1317,15 @@ def create_resource(model_or_index, name=None):
         name = name or model_or_index.Meta.table_name
         resource_class = ModelResource
 
-    cls = type('{0}Resource'.format(model_or_index.__name__), (resource_class,), {'pynamo_model': model_or_index, 'name': name})
+    cls = type('{0}Resource'.format(model_or_index.__name__), (resource_class,), {'pynamo_model': model_or_index,
+                                                                                  'name': name,
+                                                                                  'connection_settings': connection_settings,
+                                                                                  'cache': cache,
+                                                                                  'raw_reads': raw_reads,
+                                                                                  'prefetch_pages': prefetch_pages,
+                                                                                  'prefetch_max_items': prefetch_max_items,
+                                                                                  'hydrate': hydrate,
+                                                                                  'profiler': profiler})
 
     for name, attr in get_attributes(model_or_index).items():
         if attr.is_hash_key:
@@ -544,6 +1343,33 @@ def modelresource_factory(*args, **kwargs):
     return create_resource(*args, **kwargs)
 
 
+def get_indexes(model):
+    """
+    Return the secondary index classes defined on a PynamoDB model, keyed by attribute name.
+    """
+    result = {}
+    for item in dir(model):
+        item_cls = getattr(getattr(model, item), "__class__", None)
+        if item_cls is None:
+            continue
+        if issubclass(item_cls, indexes.Index):
+            result[item] = item_cls
+    return result
+
+
+def partition_key(model_or_index, hash_key):
+    """
+    Identify the table or index partition that a hash key value belongs to.
+    """
+    if issubclass(model_or_index, indexes.Index):
+        table_name = model_or_index.Meta.model.Meta.table_name
+        index_name = model_or_index.Meta.index_name
+    else:
+        table_name = model_or_index.Meta.table_name
+        index_name = None
+    return (table_name, index_name, text_type(hash_key) if hash_key is not None else None)
+
+
 def monkeypatch_swagger():
     import flask_restx.model
     import flask_restx.api
@@ -570,5 +1396,6 @@ def get_attributes(model_or_index):
     return func()
 
 
-__all__ = ['ModelResource', 'IndexResource', 'create_resource', 'modelresource_factory']
+__all__ = ['ModelResource', 'IndexResource', 'create_resource', 'modelresource_factory', 'get_connection_stats', 'ResultCache',
+           'Profiler', 'HotKeyTracker']
 monkeypatch_swagger()
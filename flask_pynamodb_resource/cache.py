@@ -0,0 +1,135 @@
+import logging
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache(object):
+    """
+    A bounded, in-process cache for marshalled query and scan results.
+
+    Query results are tagged with the partition they were read from, so that writes can
+    invalidate only the partitions they touch. Scan results span every partition and are
+    not invalidated by writes; they are only cached if a scan_ttl (staleness budget) is set,
+    and are served until it expires.
+
+    Each partition has a generation that is advanced when it is invalidated. Callers take the
+    generation before loading a result and pass it to set(), so that a result loaded while a
+    concurrent write invalidated its partition is not cached.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024, scan_ttl=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.scan_ttl = scan_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._partitions = {}
+        self._generations = {}
+        self._epoch = 0
+        self._lock = Lock()
+
+    def get(self, key):
+        """
+        Return the cached value for a key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, partition, value = entry
+                if expires > time():
+                    # Move to the end so that the least recently used entry is evicted first
+                    del self._entries[key]
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def generation(self, partition):
+        """
+        Return the current generation of a partition, to be passed to set().
+        """
+        with self._lock:
+            return self._generation(partition)
+
+    def set(self, key, value, partition=None, generation=None):
+        """
+        Cache a value. Entries without a partition are treated as scan results.
+        If a generation is passed and the partition has since been invalidated, the value is not cached.
+        """
+        ttl = self.ttl if partition is not None else self.scan_ttl
+        if not ttl or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation(partition):
+                logger.debug('Not caching result for {}; partition was invalidated while loading'.format(partition))
+                return
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (time() + ttl, partition, value)
+            if partition is not None:
+                self._partitions.setdefault(partition, set()).add(key)
+
+    def invalidate(self, partitions):
+        """
+        Remove all entries read from any of the given partitions.
+        """
+        with self._lock:
+            for partition in partitions:
+                self._advance(partition)
+                for key in list(self._partitions.get(partition, ())):
+                    self._remove(key)
+        logger.debug('Invalidated cached results for {}'.format(partitions))
+
+    def invalidate_prefix(self, prefix):
+        """
+        Remove all entries read from partitions whose key starts with the given tuple.
+        """
+        with self._lock:
+            self._advance(prefix)
+            partitions = [p for p in self._partitions if p[:len(prefix)] == prefix]
+        self.invalidate(partitions)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries),
+                    'partitions': len(self._partitions),
+                    'hits': self.hits,
+                    'misses': self.misses}
+
+    def _generation(self, partition):
+        # A partition is also invalidated by invalidate_prefix() on any of its prefixes
+        if partition is None:
+            return (self._epoch,)
+        return (self._epoch,) + tuple(self._generations.get(partition[:i], 0) for i in range(1, len(partition) + 1))
+
+    def _advance(self, partition):
+        self._generations[partition] = self._generations.get(partition, 0) + 1
+        # Bound the number of tracked generations. Advancing the epoch instead
+        # invalidates every generation handed out so far.
+        if len(self._generations) > max(self.max_entries, 1) * 4:
+            self._generations.clear()
+            self._epoch += 1
+
+    def _remove(self, key):
+        expires, partition, value = self._entries.pop(key)
+        if partition is not None:
+            keys = self._partitions.get(partition)
+            keys.discard(key)
+            if not keys:
+                del self._partitions[partition]
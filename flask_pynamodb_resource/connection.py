@@ -0,0 +1,142 @@
+import logging
+from threading import Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+# Connection settings that map directly onto PynamoDB Model.Meta attributes. TCP keep-alive
+# is not among them; PynamoDB builds its own botocore client config, so it must be enabled
+# with `tcp_keepalive = true` in the AWS config file instead.
+META_SETTINGS = (
+    'max_pool_connections',
+    'connect_timeout_seconds',
+    'read_timeout_seconds',
+    'max_retry_attempts',
+    'base_backoff_ms',
+)
+
+_lock = Lock()
+_connections = {}
+
+
+def _connection_key(model):
+    """
+    Connections are shared by all models that refer to the same table in the same region.
+    """
+    meta = model.Meta
+    return (meta.table_name, getattr(meta, 'region', None), getattr(meta, 'host', None))
+
+
+def configure_connection(model, settings=None):
+    """
+    Apply connection settings to a PynamoDB model and return its (shared) TableConnection.
+
+    Settings may include pool size, timeouts, and retries. Models that refer to the same
+    table and region share a single connection and therefore a single connection pool;
+    settings passed for a table that is already configured are ignored.
+    """
+    settings = dict(settings or {})
+    for name in settings:
+        if name not in META_SETTINGS:
+            raise ValueError('Unsupported connection setting: {}'.format(name))
+
+    key = _connection_key(model)
+    with _lock:
+        if key in _connections:
+            connection, existing = _connections[key]
+            if settings and settings != existing:
+                logger.warn('Connection for {} already configured with {}; ignoring {}'.format(key, existing, settings))
+        else:
+            for name in META_SETTINGS:
+                if name in settings:
+                    setattr(model.Meta, name, settings[name])
+            model._connection = None
+            connection = model._get_connection()
+            _connections[key] = (connection, settings)
+            logger.debug('Configured connection for {} with {}'.format(key, settings))
+
+    model._connection = connection
+    return connection
+
+
+def warm_connection(model, connections=1):
+    """
+    Validate the model's table via DescribeTable and pre-open up to `connections` pooled
+    connections, so that the first requests served by each worker do not pay for the TLS
+    handshake and credential resolution.
+    """
+    connection = model._get_connection()
+
+    # The first call resolves credentials and creates the client; do it alone so that
+    # the concurrent calls below do not race to create the client themselves.
+    description = connection.describe_table()
+    status = description.get('TableStatus') if description else None
+    if status not in ('ACTIVE', 'UPDATING'):
+        logger.warn('Table {} is not active: {}'.format(model.Meta.table_name, status))
+
+    # Concurrent requests each check out their own connection from the pool. One of them
+    # reuses the connection opened above, so all of them are needed to open the rest.
+    errors = []
+
+    def describe():
+        try:
+            connection.describe_table()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=describe) for _ in range(max(0, connections))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for e in errors:
+        logger.warn('Failed to warm connection for {}: {}'.format(model.Meta.table_name, e))
+
+    logger.debug('Warmed {} connection(s) for {}'.format(connections, model.Meta.table_name))
+    return description
+
+
+def get_connection_stats():
+    """
+    Return connection pool usage for all configured connections, keyed by (table name, region, host).
+    """
+    with _lock:
+        connections = list(_connections.items())
+
+    stats = {}
+    for key, (connection, settings) in connections:
+        stats[key] = {
+            'settings': settings,
+            'pools': _pool_stats(connection),
+        }
+    return stats
+
+
+def _pool_stats(connection):
+    """
+    Dig the urllib3 connection pools out of the botocore client. The attributes involved
+    are not public API, so anything unexpected results in an empty list.
+    """
+    client = getattr(connection.connection, '_client', None)
+    manager = getattr(getattr(getattr(client, '_endpoint', None), 'http_session', None), '_manager', None)
+    pools = getattr(manager, 'pools', None)
+    if pools is None:
+        return []
+
+    stats = []
+    for pool_key in pools.keys():
+        pool = pools.get(pool_key)
+        if pool is None:
+            continue
+        queue = getattr(pool, 'pool', None)
+        idle = len([c for c in list(getattr(queue, 'queue', [])) if c is not None])
+        maxsize = getattr(queue, 'maxsize', 0)
+        stats.append({
+            'host': getattr(pool, 'host', None),
+            'maxsize': maxsize,
+            'in_use': maxsize - queue.qsize() if queue is not None else 0,
+            'idle': idle,
+            'opened': getattr(pool, 'num_connections', 0),
+            'requests': getattr(pool, 'num_requests', 0),
+        })
+    return stats
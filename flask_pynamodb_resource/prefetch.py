@@ -0,0 +1,112 @@
+import logging
+import sys
+from collections import deque
+from threading import Condition, Thread
+
+from pynamodb.constants import ITEMS, LAST_EVALUATED_KEY
+from six import reraise
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchIterator(object):
+    """
+    Iterates over the items returned by a paginated Query or Scan operation, fetching
+    the following pages in a background thread while the caller consumes the current one.
+
+    At most `depth` pages are buffered ahead of the caller. If `max_items` is set, no further
+    pages are fetched while that many items are buffered, although a single page is always
+    allowed so that progress can be made.
+    """
+
+    def __init__(self, operation, args, kwargs, map_fn=None, depth=1, max_items=None):
+        self._operation = operation
+        self._args = args
+        self._kwargs = dict(kwargs)
+        self._map_fn = map_fn
+        self._depth = max(1, depth)
+        self._max_items = max_items
+        self._pages = deque()
+        self._buffered = 0
+        self._done = False
+        self._closed = False
+        self._error = None
+        self._condition = Condition()
+        self._items = iter(())
+
+        # The first page is fetched directly, and the background thread only started if there are more.
+        page = self._operation(*self._args, **self._kwargs)
+        self._items = iter(page.get(ITEMS, []))
+        if page.get(LAST_EVALUATED_KEY):
+            self._kwargs['exclusive_start_key'] = page[LAST_EVALUATED_KEY]
+            self._thread = Thread(target=self._fetch)
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._done = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            for item in self._items:
+                return self._map_fn(item) if self._map_fn else item
+            self._items = iter(self._next_page())
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop fetching pages. Pages that are already being fetched are discarded.
+        """
+        with self._condition:
+            self._closed = True
+            self._pages.clear()
+            self._condition.notify_all()
+
+    def _next_page(self):
+        with self._condition:
+            while not self._pages and not self._done:
+                self._condition.wait()
+            if self._pages:
+                page = self._pages.popleft()
+                self._buffered -= len(page)
+                self._condition.notify_all()
+                return page
+            if self._error:
+                reraise(*self._error)
+            raise StopIteration
+
+    def _fetch(self):
+        try:
+            while True:
+                with self._condition:
+                    while not self._closed and self._pages and self._is_full():
+                        self._condition.wait()
+                    if self._closed:
+                        return
+
+                page = self._operation(*self._args, **self._kwargs)
+                items = page.get(ITEMS, [])
+
+                with self._condition:
+                    self._pages.append(items)
+                    self._buffered += len(items)
+                    self._condition.notify_all()
+
+                if not page.get(LAST_EVALUATED_KEY):
+                    return
+                self._kwargs['exclusive_start_key'] = page[LAST_EVALUATED_KEY]
+        except Exception:
+            logger.debug('Failed to prefetch page', exc_info=True)
+            self._error = sys.exc_info()
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def _is_full(self):
+        if len(self._pages) >= self._depth:
+            return True
+        return self._max_items is not None and self._buffered >= self._max_items
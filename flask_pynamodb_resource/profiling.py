@@ -0,0 +1,190 @@
+import cProfile
+import hmac
+import logging
+import os
+import random
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+from timeit import default_timer
+
+from six import text_type
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler(object):
+    """
+    Opt-in profiling for registered resources.
+
+    Requests that carry the configured token in the profile header receive a Server-Timing
+    response header breaking the request down into phases, and, if a dump directory is set,
+    a sampled fraction of them are also run under cProfile. If a HotKeyTracker is set, a
+    sampled fraction of all requests record the hash key they accessed.
+    """
+    HEADER = 'X-Pynamo-Profile'
+
+    def __init__(self, token, hot_keys=None, sample_rate=1.0, dump_dir=None, dump_sample_rate=1.0):
+        self.token = token
+        self.hot_keys = hot_keys
+        self.sample_rate = sample_rate
+        self.dump_dir = dump_dir
+        self.dump_sample_rate = dump_sample_rate
+
+    def is_authorized(self, request):
+        value = request.headers.get(self.HEADER)
+        if not (self.token and value):
+            return False
+        # compare_digest only accepts ASCII strings, so compare the encoded bytes instead
+        return hmac.compare_digest(_to_bytes(value), _to_bytes(self.token))
+
+    def start(self, request):
+        """
+        Return a profile for the current request, or NULL_PROFILE if it is neither authorized nor sampled.
+        """
+        authorized = self.is_authorized(request)
+        sampled = self.hot_keys is not None and random.random() < self.sample_rate
+        if not authorized and not sampled:
+            return NULL_PROFILE
+
+        profile = RequestProfile(report=authorized, sampled=sampled)
+        if authorized and self.dump_dir and random.random() < self.dump_sample_rate:
+            profile.profiler = cProfile.Profile()
+        return profile
+
+    def finish(self, profile, endpoint):
+        """
+        Write the cProfile dump for a request, if one was collected, and return its path.
+        """
+        if profile.profiler is None:
+            return None
+        path = os.path.join(self.dump_dir, '{}-{:.6f}.prof'.format(endpoint, time()))
+        profile.profiler.dump_stats(path)
+        logger.info('Wrote profile for {} to {}'.format(endpoint, path))
+        return path
+
+
+class RequestProfile(object):
+    """
+    Accumulates time spent in each phase of a request, and the DynamoDB capacity it consumed.
+    Phases may be recorded from prefetch and batch threads, so updates are locked.
+    Only sampled requests record hot keys, so that counts can be scaled by the sample rate.
+    """
+    enabled = True
+
+    def __init__(self, report=True, sampled=False):
+        self.report = report
+        self.sampled = sampled
+        self.profiler = None
+        self.phases = {}
+        self.capacity = 0.0
+        self._lock = Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.add(name, default_timer() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_capacity(self, consumed):
+        """
+        Add the ConsumedCapacity from a DynamoDB response, which may be a single entry or a list.
+        """
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        with self._lock:
+            for entry in consumed or ():
+                self.capacity += entry.get('CapacityUnits', 0.0)
+
+    def server_timing(self):
+        """
+        Format the phase breakdown as a Server-Timing header value, in milliseconds.
+        """
+        with self._lock:
+            phases = sorted(self.phases.items())
+        return ', '.join('{};dur={:.3f}'.format(name, seconds * 1000) for name, seconds in phases)
+
+
+class NullProfile(object):
+    """
+    Stands in for a RequestProfile when the request is not being profiled.
+    """
+    enabled = False
+    report = False
+    sampled = False
+    profiler = None
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def add(self, name, seconds):
+        pass
+
+    def add_capacity(self, consumed):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return text_type(value).encode('utf-8')
+
+
+class HotKeyTracker(object):
+    """
+    Tracks the most frequently accessed hash keys for each table and index, using the
+    Space-Saving algorithm to bound memory to `capacity` keys per table or index.
+    Counts are recorded for sampled requests only, and scaled by the sample rate when reported.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._scopes = {}
+        self._lock = Lock()
+
+    def record(self, table_name, index_name, hash_key, capacity_units=0.0):
+        with self._lock:
+            counters = self._scopes.setdefault((table_name, index_name), {})
+            counter = counters.get(hash_key)
+            if counter is None:
+                if len(counters) >= self.capacity:
+                    # Replace the least frequently seen key; its count becomes the new key's error bound
+                    evicted = min(counters, key=lambda k: counters[k][0])
+                    requests = counters.pop(evicted)[0]
+                    counter = counters[hash_key] = [requests, 0.0, requests]
+                else:
+                    counter = counters[hash_key] = [0, 0.0, 0]
+            counter[0] += 1
+            counter[1] += capacity_units
+
+    def top(self, limit=None, sample_rate=1.0):
+        """
+        Return the hottest keys for each table and index, with estimated request and capacity counts.
+        """
+        scale = 1.0 / sample_rate if sample_rate else 1.0
+        with self._lock:
+            scopes = [(scope, list(counters.items())) for scope, counters in self._scopes.items()]
+
+        result = {}
+        for (table_name, index_name), counters in scopes:
+            counters.sort(key=lambda item: item[1][0], reverse=True)
+            result.setdefault(table_name, {})[index_name or ''] = [{'key': key,
+                                                                    'requests': int(requests * scale),
+                                                                    'capacity_units': capacity * scale,
+                                                                    'error': int(error * scale)}
+                                                                   for key, (requests, capacity, error) in counters[:limit]]
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
@@ -0,0 +1,105 @@
+import unittest
+
+from flask_pynamodb_resource.cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = ResultCache(ttl=60)
+        cache.set('a', [1], ('t', None, '1'))
+        self.assertEqual(cache.get('a'), [1])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_expiry(self):
+        cache = ResultCache(ttl=-1)
+        cache.set('a', [1], ('t', None, '1'))
+        self.assertIsNone(cache.get('a'))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(ttl=60, max_entries=2)
+        cache.set('a', [1], ('t', None, '1'))
+        cache.set('b', [2], ('t', None, '2'))
+        # Reading 'a' makes 'b' the least recently used entry
+        cache.get('a')
+        cache.set('c', [3], ('t', None, '3'))
+        self.assertEqual(cache.get('a'), [1])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), [3])
+        self.assertEqual(cache.stats()['partitions'], 2)
+
+    def test_scans_require_scan_ttl(self):
+        cache = ResultCache(ttl=60)
+        cache.set('scan', [1])
+        self.assertIsNone(cache.get('scan'))
+
+        cache = ResultCache(ttl=60, scan_ttl=60)
+        cache.set('scan', [1])
+        self.assertEqual(cache.get('scan'), [1])
+
+    def test_invalidate_partition(self):
+        cache = ResultCache(ttl=60, scan_ttl=60)
+        cache.set('a', [1], ('t', None, '1'))
+        cache.set('a2', [1], ('t', None, '1'))
+        cache.set('b', [2], ('t', None, '2'))
+        cache.set('scan', [3])
+        cache.invalidate([('t', None, '1')])
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('a2'))
+        self.assertEqual(cache.get('b'), [2])
+        # Scans are only bounded by their staleness budget
+        self.assertEqual(cache.get('scan'), [3])
+
+    def test_invalidate_prefix(self):
+        cache = ResultCache(ttl=60)
+        cache.set('a', [1], ('t', 'idx', '1'))
+        cache.set('b', [2], ('t', 'idx', '2'))
+        cache.set('c', [3], ('t', None, '1'))
+        cache.invalidate_prefix(('t', 'idx'))
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), [3])
+
+    def test_stale_load_not_cached(self):
+        cache = ResultCache(ttl=60)
+        partition = ('t', None, '1')
+        generation = cache.generation(partition)
+        # A write invalidates the partition while the result is being loaded
+        cache.invalidate([partition])
+        cache.set('a', [1], partition, generation)
+        self.assertIsNone(cache.get('a'))
+
+        generation = cache.generation(partition)
+        cache.set('a', [1], partition, generation)
+        self.assertEqual(cache.get('a'), [1])
+
+    def test_stale_load_not_cached_after_prefix_invalidation(self):
+        cache = ResultCache(ttl=60)
+        partition = ('t', 'idx', '1')
+        generation = cache.generation(partition)
+        cache.invalidate_prefix(('t', 'idx'))
+        cache.set('a', [1], partition, generation)
+        self.assertIsNone(cache.get('a'))
+
+    def test_other_partitions_unaffected_by_invalidation(self):
+        cache = ResultCache(ttl=60)
+        generation = cache.generation(('t', None, '1'))
+        cache.invalidate([('t', None, '2')])
+        cache.set('a', [1], ('t', None, '1'), generation)
+        self.assertEqual(cache.get('a'), [1])
+
+    def test_clear(self):
+        cache = ResultCache(ttl=60)
+        partition = ('t', None, '1')
+        generation = cache.generation(partition)
+        cache.set('a', [1], partition)
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', [1], partition, generation)
+        self.assertIsNone(cache.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+
+from flask_pynamodb_resource.prefetch import PrefetchIterator
+
+
+class FakeOperation(object):
+    """
+    Simulates a paginated Query or Scan operation returning `pages` pages of `size` items.
+    """
+
+    def __init__(self, pages=5, size=10, fail_at=None):
+        self.pages = pages
+        self.size = size
+        self.fail_at = fail_at
+        self.calls = []
+        self.threads = set()
+
+    def __call__(self, *args, **kwargs):
+        start = kwargs.get('exclusive_start_key') or 0
+        self.calls.append(start)
+        self.threads.add(threading.current_thread().name)
+        if self.fail_at is not None and start >= self.fail_at:
+            raise ValueError('Failed at {}'.format(start))
+        end = start + self.size
+        page = {'Items': list(range(start, end))}
+        if end < self.pages * self.size:
+            page['LastEvaluatedKey'] = end
+        return page
+
+
+def wait_for_calls(operation, count, timeout=2.0):
+    deadline = time.time() + timeout
+    while len(operation.calls) < count and time.time() < deadline:
+        time.sleep(0.01)
+    # Give the fetch thread a chance to overshoot, if it is going to
+    time.sleep(0.1)
+
+
+class PrefetchIteratorTest(unittest.TestCase):
+
+    def test_page_ordering(self):
+        operation = FakeOperation(pages=5, size=10)
+        results = list(PrefetchIterator(operation, (), {}, depth=2))
+        self.assertEqual(results, list(range(50)))
+        self.assertEqual(operation.calls, [0, 10, 20, 30, 40])
+
+    def test_map_fn(self):
+        operation = FakeOperation(pages=2, size=3)
+        results = list(PrefetchIterator(operation, (), {}, map_fn=lambda i: i * 2))
+        self.assertEqual(results, [0, 2, 4, 6, 8, 10])
+
+    def test_single_page_does_not_start_thread(self):
+        operation = FakeOperation(pages=1, size=3)
+        results = list(PrefetchIterator(operation, (), {}))
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(operation.threads, set([threading.current_thread().name]))
+
+    def test_error_propagation(self):
+        operation = FakeOperation(pages=5, size=10, fail_at=30)
+        results = []
+        with self.assertRaises(ValueError):
+            for item in PrefetchIterator(operation, (), {}, depth=2):
+                results.append(item)
+        # Pages fetched before the failure are still returned
+        self.assertEqual(results, list(range(30)))
+
+    def test_error_on_first_page(self):
+        operation = FakeOperation(fail_at=0)
+        with self.assertRaises(ValueError):
+            PrefetchIterator(operation, (), {})
+
+    def test_depth_limits_look_ahead(self):
+        operation = FakeOperation(pages=10, size=10)
+        results = PrefetchIterator(operation, (), {}, depth=2)
+        wait_for_calls(operation, 3)
+        # The first page plus two pages of look-ahead
+        self.assertEqual(len(operation.calls), 3)
+
+        next(results)
+        self.assertEqual(len(operation.calls), 3)
+        results.close()
+
+    def test_max_items_back_pressure(self):
+        operation = FakeOperation(pages=10, size=10)
+        results = PrefetchIterator(operation, (), {}, depth=5, max_items=15)
+        wait_for_calls(operation, 3)
+        # Two buffered pages hold 20 items, which reaches the cap of 15
+        self.assertEqual(len(operation.calls), 3)
+
+        # Consuming the first page and one buffered page frees room for one more page
+        for _ in range(20):
+            next(results)
+        wait_for_calls(operation, 4)
+        self.assertEqual(len(operation.calls), 4)
+        results.close()
+
+    def test_max_items_allows_oversized_page(self):
+        operation = FakeOperation(pages=3, size=10)
+        results = list(PrefetchIterator(operation, (), {}, max_items=1))
+        self.assertEqual(results, list(range(30)))
+
+    def test_close_stops_fetching(self):
+        operation = FakeOperation(pages=100, size=10)
+        results = PrefetchIterator(operation, (), {}, depth=1)
+        wait_for_calls(operation, 2)
+        results.close()
+        time.sleep(0.1)
+        self.assertLessEqual(len(operation.calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from flask import Flask
+
+from flask_pynamodb_resource.profiling import NULL_PROFILE, HotKeyTracker, Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def start(self, profiler, headers=None):
+        with self.app.test_request_context('/', headers=headers or {}):
+            from flask import request
+            return profiler.start(request)
+
+    def test_authorized(self):
+        profiler = Profiler(token='secret')
+        profile = self.start(profiler, {Profiler.HEADER: 'secret'})
+        self.assertTrue(profile.enabled)
+        self.assertTrue(profile.report)
+        self.assertFalse(profile.sampled)
+
+    def test_unauthorized(self):
+        profiler = Profiler(token='secret')
+        self.assertIs(self.start(profiler, {Profiler.HEADER: 'wrong'}), NULL_PROFILE)
+        self.assertIs(self.start(profiler), NULL_PROFILE)
+
+    def test_non_ascii_header(self):
+        profiler = Profiler(token='secret')
+        self.assertIs(self.start(profiler, {Profiler.HEADER: u'café'}), NULL_PROFILE)
+        self.assertIs(self.start(profiler, {Profiler.HEADER: u'café'.encode('utf-8')}), NULL_PROFILE)
+
+    def test_sampled(self):
+        profiler = Profiler(token='secret', hot_keys=HotKeyTracker(), sample_rate=1.0)
+        profile = self.start(profiler)
+        self.assertTrue(profile.sampled)
+        self.assertFalse(profile.report)
+
+        profiler.sample_rate = 0.0
+        self.assertIs(self.start(profiler), NULL_PROFILE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import unittest
+
+from botocore.exceptions import ClientError
+from flask import Flask
+from pynamodb.attributes import NumberAttribute, UnicodeAttribute
+from pynamodb.connection.base import Connection
+from pynamodb.models import Model
+
+from flask_pynamodb_resource import create_resource
+
+
+class Score(Model):
+    class Meta:
+        table_name = 'Score'
+        region = 'us-east-1'
+
+    player = UnicodeAttribute(hash_key=True)
+    game = UnicodeAttribute(range_key=True)
+    points = NumberAttribute(null=True)
+
+
+class Team(Model):
+    class Meta:
+        table_name = 'Team'
+        region = 'us-east-1'
+
+    name = UnicodeAttribute(hash_key=True)
+    owner = UnicodeAttribute(null=True)
+
+
+def describe_table(model):
+    # All key attributes in these tests are strings
+    key_schema = []
+    definitions = []
+    for name, attr in model.get_attributes().items():
+        if attr.is_hash_key or attr.is_range_key:
+            key_schema.append({'AttributeName': attr.attr_name, 'KeyType': 'HASH' if attr.is_hash_key else 'RANGE'})
+            definitions.append({'AttributeName': attr.attr_name, 'AttributeType': 'S'})
+    return {'Table': {'TableName': model.Meta.table_name,
+                      'TableStatus': 'ACTIVE',
+                      'KeySchema': key_schema,
+                      'AttributeDefinitions': definitions}}
+
+
+def deny(view):
+    def wrapper(*args, **kwargs):
+        return ({'message': 'Denied'}, 403)
+    return wrapper
+
+
+class TransactResourceTest(unittest.TestCase):
+    """
+    Exercises the /_transact endpoint without DynamoDB, by capturing the requests that PynamoDB would send.
+    """
+
+    def setUp(self):
+        self.calls = []
+        self.error = None
+        self._make_api_call = Connection._make_api_call
+
+        def make_api_call(connection, operation_name, operation_kwargs):
+            return self.make_api_call(operation_name, operation_kwargs)
+        Connection._make_api_call = make_api_call
+
+        self.score_resource = create_resource(Score)
+        self.team_resource = create_resource(Team)
+        self.app = Flask(__name__)
+        self.score_resource.register(self.app, '/scores', transact=True)
+        self.team_resource.register(self.app, '/teams', transact=True)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        Connection._make_api_call = self._make_api_call
+
+    def make_api_call(self, operation_name, operation_kwargs):
+        if operation_name == 'DescribeTable':
+            return describe_table([Score, Team][operation_kwargs['TableName'] == 'Team'])
+        self.calls.append((operation_name, operation_kwargs))
+        if self.error is not None:
+            raise self.error(operation_kwargs)
+        return {}
+
+    def transact(self, operations):
+        response = self.client.post('/_transact', json={'operations': operations})
+        return response.status_code, response.get_json()
+
+    def submitted(self):
+        self.assertEqual(len(self.calls), 1)
+        operation_name, operation_kwargs = self.calls[0]
+        self.assertEqual(operation_name, 'TransactWriteItems')
+        return [list(item.items())[0] for item in operation_kwargs['TransactItems']]
+
+    def mixed_operations(self):
+        return [
+            {'action': 'update', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1'}, 'attributes': {'points': 5}},
+            {'action': 'put', 'table': 'Team', 'item': {'name': 't1', 'owner': 'a'}},
+            {'action': 'condition_check', 'table': 'Team', 'key': {'name': 't2'}, 'condition': {'owner': None}},
+            {'action': 'delete', 'table': 'Score', 'key': {'player': 'b', 'game': 'g2'}},
+        ]
+
+    def test_mixed_operations(self):
+        status, data = self.transact(self.mixed_operations())
+        self.assertEqual(status, 200)
+        self.assertEqual([(r['index'], r['action'], r['table']) for r in data['operations']],
+                         [(0, 'update', 'Score'), (1, 'put', 'Team'), (2, 'condition_check', 'Team'), (3, 'delete', 'Score')])
+        self.assertEqual(data['operations'][1]['item'], {'name': 't1', 'owner': 'a'})
+        self.assertEqual([kind for kind, item in self.submitted()], ['ConditionCheck', 'Delete', 'Put', 'Update'])
+
+    def test_cancellation_reasons(self):
+        codes = {'a': 'TransactionConflict', 'b': 'ConditionalCheckFailed'}
+
+        def cancelled(operation_kwargs):
+            reasons = []
+            for item in operation_kwargs['TransactItems']:
+                body = list(item.values())[0]
+                key = body.get('Key') or body.get('Item')
+                hash_key = (key.get('player') or key.get('name'))['S']
+                reasons.append({'Code': codes.get(hash_key, 'None')})
+            return ClientError({'Error': {'Code': 'TransactionCanceledException', 'Message': 'Transaction cancelled'},
+                                'CancellationReasons': reasons}, 'TransactWriteItems')
+
+        self.error = cancelled
+        status, data = self.transact(self.mixed_operations())
+        self.assertEqual(status, 409)
+        self.assertEqual(dict((e['index'], e['code']) for e in data['errors']),
+                         {0: 'TransactionConflict', 3: 'ConditionalCheckFailed'})
+
+    def test_client_error(self):
+        self.error = lambda kwargs: ClientError({'Error': {'Code': 'ValidationException', 'Message': 'Bad item'}},
+                                                'TransactWriteItems')
+        status, data = self.transact(self.mixed_operations())
+        self.assertEqual(status, 400)
+        self.assertEqual(data['message'], 'Bad item')
+
+    def test_server_error(self):
+        self.error = lambda kwargs: ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Slow down'}},
+                                                'TransactWriteItems')
+        status, data = self.transact(self.mixed_operations())
+        self.assertEqual(status, 500)
+
+    def test_update_requires_existing_record(self):
+        status, data = self.transact([
+            {'action': 'update', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1'}, 'attributes': {'points': 5}},
+        ])
+        self.assertEqual(status, 200)
+        kind, update = self.submitted()[0]
+        self.assertEqual(kind, 'Update')
+        names = update['ExpressionAttributeNames']
+        self.assertEqual(update['ConditionExpression'].replace(' ', ''), 'attribute_exists({})'.format(
+            [k for k, v in names.items() if v == 'player'][0]))
+
+    def test_update_requires_existing_record_with_condition(self):
+        status, data = self.transact([
+            {'action': 'update', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1'}, 'attributes': {'points': 5},
+             'condition': {'points': 4}},
+        ])
+        self.assertEqual(status, 200)
+        kind, update = self.submitted()[0]
+        self.assertIn('attribute_exists', update['ConditionExpression'])
+        self.assertIn(' AND ', update['ConditionExpression'])
+        self.assertEqual(sorted(update['ExpressionAttributeNames'].values()), ['player', 'points'])
+
+    def test_method_decorators(self):
+        self.score_resource.method_decorators = {'delete': [deny]}
+        status, data = self.transact(self.mixed_operations())
+        self.assertEqual(status, 403)
+        self.assertEqual(data, {'message': 'Denied'})
+        self.assertEqual(self.calls, [])
+
+        status, data = self.transact(self.mixed_operations()[:3])
+        self.assertEqual(status, 200)
+
+    def test_validation_errors(self):
+        status, data = self.transact([
+            'put',
+            {'action': 'replace', 'table': 'Score'},
+            {'action': ['put'], 'table': 'Score'},
+            {'action': 'put', 'table': ['Score'], 'item': {'player': 'a', 'game': 'g1'}},
+            {'action': 'put', 'table': 'Score', 'item': {'player': 'a'}},
+            {'action': 'put', 'table': 'Score', 'item': {'player': 'a/b', 'game': 'g1'}},
+            {'action': 'delete', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1/2'}},
+            {'action': 'delete', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1', 'points': 1}},
+            {'action': 'update', 'table': 'Score', 'key': {'player': 'a', 'game': 'g1'}},
+            {'action': 'condition_check', 'table': 'Team', 'key': {'name': 't'}},
+            {'action': 'put', 'table': 'Team', 'item': {'name': 't', 'owner': 'a'}},
+        ])
+        self.assertEqual(status, 400)
+        self.assertEqual(data['errors'], [
+            {'index': 0, 'message': 'Invalid operation type: str'},
+            {'index': 1, 'message': 'Invalid action: replace'},
+            {'index': 2, 'message': 'Invalid action: [\'put\']'},
+            {'index': 3, 'message': 'Unknown table: [\'Score\']'},
+            {'index': 4, 'message': 'Missing key attribute: game'},
+            {'index': 5, 'message': '\'player\' may not contain forward slashes'},
+            {'index': 6, 'message': '\'game\' may not contain forward slashes'},
+            {'index': 7, 'message': 'Key may only contain player, game'},
+            {'index': 8, 'message': 'Update must set at least one attribute'},
+            {'index': 9, 'message': 'condition_check requires a condition'},
+        ])
+        self.assertEqual(self.calls, [])
+
+    def test_empty(self):
+        status, data = self.transact([])
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()